@@ -1,7 +1,8 @@
 from .mapper import SwitchMapper
 from .config import Config, SwitchConfig, BMCConfig
-from .nxapi_client import NXAPIClient, PortConnection
-from .bmc_client import create_bmc_client, BMCClient, ILOClient, IDRACClient
+from .nxapi_client import NXAPIClient, NXAPIError, NXAPITransient, PortConnection
+from .bmc_client import create_bmc_client, BMCClient, BMCError, NetworkInterface, RedfishClient, ILOClient, IDRACClient
+from .cache import ResponseCache
 
 __version__ = '0.1.0'
 
@@ -11,9 +12,15 @@ __all__ = [
     'SwitchConfig',
     'BMCConfig',
     'NXAPIClient',
+    'NXAPIError',
+    'NXAPITransient',
     'PortConnection',
     'create_bmc_client',
     'BMCClient',
+    'BMCError',
+    'RedfishClient',
     'ILOClient',
-    'IDRACClient'
+    'IDRACClient',
+    'NetworkInterface',
+    'ResponseCache'
 ]
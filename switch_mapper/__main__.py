@@ -1,6 +1,19 @@
 import argparse
+import logging
 import os
 from .mapper import SwitchMapper
+from .cache import ResponseCache, TTL_POLICIES
+
+def _parse_ttl(value: str) -> int:
+    """Accept a named cache policy or a number of seconds"""
+    if value in TTL_POLICIES:
+        return TTL_POLICIES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected seconds or one of: {', '.join(TTL_POLICIES)}"
+        )
 
 def main():
     parser = argparse.ArgumentParser(description='Map Nexus switch connections and generate diagrams')
@@ -14,13 +27,39 @@ def main():
         default='network_diagram',
         help='Output file base name (without extension)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always query switches and BMCs instead of using cached responses'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=_parse_ttl,
+        default=TTL_POLICIES['normal'],
+        help='Cached BMC response lifetime in seconds, or short/normal/long'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Print progress and log raw API payloads and other debug details'
+    )
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(levelname)s %(name)s: %(message)s'
+    )
+
+    cache = None if args.no_cache else ResponseCache(ttl=args.cache_ttl)
+
     # Create mapper instance
-    mapper = SwitchMapper(args.config)
+    mapper = SwitchMapper(args.config, cache, verbose=args.verbose)
     
     # Map network and generate outputs
-    diagram_path, text_report = mapper.map_network(args.output)
+    try:
+        diagram_path, text_report = mapper.map_network(args.output)
+    finally:
+        mapper.close()
     
     # Save text report
     report_path = f"{args.output}_report.txt"
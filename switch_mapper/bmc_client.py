@@ -1,217 +1,498 @@
-from abc import ABC, abstractmethod
+import atexit
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
 import requests
-from typing import Dict, List, Optional
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Protocol, Tuple, Union, runtime_checkable
+import logging
+import re
+import ssl
+import threading
+import time
 import urllib3
+from .cache import ResponseCache
+
+# orjson decodes large Redfish payloads much faster; stdlib json keeps things working without it
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _pretty(data) -> str:
+        """Serialize a payload as indented JSON for debug logging"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _pretty(data) -> str:
+        """Serialize a payload as indented JSON for debug logging"""
+        return json.dumps(data, indent=2)
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-class BMCClient(ABC):
-    """Abstract base class for BMC/ILO clients"""
-    
-    @abstractmethod
+logger = logging.getLogger(__name__)
+
+# Maximum number of collection members fetched concurrently across all BMCs
+# (must stay at or below the per-host pool size so fetches reuse sockets)
+MEMBER_FETCH_WORKERS = 32
+
+# Connect and read timeouts (seconds) for every Redfish request
+REQUEST_TIMEOUT = (5, 30)
+
+# Seconds a client reuses its in-memory copy of the system resource
+SYSTEM_CACHE_TTL = 60
+
+class BMCError(Exception):
+    """Raised when a BMC cannot be reached or rejects a request"""
+
+# Failures get_network_info recovers from: request errors, undecodable JSON, unexpected payload shapes
+_PAYLOAD_ERRORS = (KeyError, AttributeError, TypeError)
+_NETWORK_INFO_ERRORS = (BMCError, ValueError) + _PAYLOAD_ERRORS
+
+@dataclass(slots=True)
+class NetworkInterface:
+    name: str
+    mac_address: str
+    status: str
+
+# MAC addresses are ASCII hex, so only a-f ever needs upper-casing
+_UPPER_HEX = bytes.maketrans(b'abcdef', b'ABCDEF')
+
+def _norm_mac(mac: str) -> str:
+    """Upper-case a MAC address without a full Unicode case mapping"""
+    return mac.encode('ascii', 'ignore').translate(_UPPER_HEX).decode('ascii')
+
+# Matches property names that hold a MAC address, e.g. MACAddress, PermanentMacAddress
+_MAC_KEY = re.compile(r'MAC', re.IGNORECASE)
+
+def _find_mac_addresses(data) -> List[NetworkInterface]:
+    """Walk a Redfish payload breadth-first and collect every MAC-like string property"""
+    interfaces = []
+    pending = deque([(data, '')])
+    while pending:
+        node, prefix = pending.popleft()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, str) and _MAC_KEY.search(key):
+                    interfaces.append(NetworkInterface(
+                        name=f"{prefix}{key.replace('MAC', '').replace('Address', '')}",
+                        mac_address=_norm_mac(value),
+                        status='OK'
+                    ))
+                elif isinstance(value, (dict, list)):
+                    pending.append((value, f"{prefix}{key}."))
+        elif isinstance(node, list):
+            for i, item in enumerate(node):
+                pending.append((item, f"{prefix}[{i}]."))
+    return interfaces
+
+def _resolve_url(host: str, endpoint: str) -> str:
+    """Build a request URL from a relative endpoint or an @odata.id path"""
+    if endpoint.startswith(('https://', 'http://')):
+        return endpoint
+    if endpoint.startswith('/'):
+        return f"https://{host}{endpoint}"
+    return f"https://{host}/redfish/v1/{endpoint}"
+
+# Retry transient BMC errors; POST is included because this client only issues read-style calls
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[500, 502, 503, 504],
+    allowed_methods=frozenset(['GET', 'POST'])
+)
+
+# One adapter (and so one urllib3 pool per BMC host) shared by every client session,
+# so kept-alive connections survive when clients are re-created
+_SHARED_ADAPTER = HTTPAdapter(pool_connections=64, pool_maxsize=32, max_retries=_RETRY)
+atexit.register(_SHARED_ADAPTER.close)
+
+# Every client fans member fetches out onto one bounded pool instead of spinning up
+# threads per collection, so the thread count stays flat however many BMCs are polled
+_MEMBER_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_MEMBER_EXECUTOR_LOCK = threading.Lock()
+
+def _member_executor() -> ThreadPoolExecutor:
+    global _MEMBER_EXECUTOR
+    with _MEMBER_EXECUTOR_LOCK:
+        if _MEMBER_EXECUTOR is None:
+            _MEMBER_EXECUTOR = ThreadPoolExecutor(
+                max_workers=MEMBER_FETCH_WORKERS, thread_name_prefix='redfish-member'
+            )
+        return _MEMBER_EXECUTOR
+
+class _PinnedAdapter(HTTPAdapter):
+    """HTTPAdapter that only accepts a peer certificate with the given SHA-256 fingerprint"""
+
+    def __init__(self, fingerprint: str, **kwargs):
+        self.fingerprint = fingerprint
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        # urllib3 checks the leaf certificate digest even when chain verification is off
+        kwargs['assert_fingerprint'] = self.fingerprint
+        super().init_poolmanager(*args, **kwargs)
+
+def get_cert_fingerprint(host: str, port: int = 443) -> str:
+    """Return the SHA-256 fingerprint of a BMC's TLS certificate, for use as cert_fingerprint"""
+    pem = ssl.get_server_certificate((host, port))
+    return hashlib.sha256(ssl.PEM_cert_to_DER_cert(pem)).hexdigest()
+
+# One keep-alive session per (host, pinned fingerprint), shared by every client of that BMC;
+# credentials are passed per request so clients with different logins can share it
+_SESSIONS: Dict[Tuple[str, Optional[str]], requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+def _session_for(host: str, cert_fingerprint: Optional[str] = None) -> requests.Session:
+    """Return the shared session for a BMC host, creating it on first use"""
+    key = (host, cert_fingerprint)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            session.verify = False
+            session.headers['Connection'] = 'keep-alive'
+            session.headers['Accept'] = 'application/json'
+            session.mount('https://', _SHARED_ADAPTER)
+            if cert_fingerprint:
+                # Self-signed BMC certificates can't be chain-verified, but they can be pinned
+                session.mount(f"https://{host}/", _PinnedAdapter(
+                    cert_fingerprint, pool_maxsize=32, max_retries=_RETRY
+                ))
+            _SESSIONS[key] = session
+        return session
+
+def _close_sessions():
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+atexit.register(_close_sessions)
+
+@runtime_checkable
+class BMCClient(Protocol):
+    """Interface implemented by BMC/ILO clients"""
+
     def get_network_info(self) -> Dict:
         """Get network information including MAC addresses"""
-        pass
+        ...
+
+    def close(self):
+        """Release any connections held by the client"""
+        ...
+
+class RedfishClient:
+    """Shared Redfish plumbing for the iLO and iDRAC clients"""
 
-class ILOClient(BMCClient):
-    def __init__(self, host: str, username: str, password: str):
+    # Name used in error messages and the path of the system resource
+    SERVICE_NAME = 'Redfish'
+    SYSTEM_PATH = 'Systems/1'
+
+    def __init__(self, host: str, username: str, password: str, cache: Optional[ResponseCache] = None,
+                 cert_fingerprint: Optional[str] = None):
         self.host = host
         self.username = username
         self.password = password
-        self.session = requests.Session()
-        self.session.verify = False
-        self.session.auth = (username, password)
+        self.session = _session_for(host, cert_fingerprint)
+        self.auth = (username, password)
         self.base_url = f"https://{host}/redfish/v1"
+        self.cache = cache
+        self._protocol_features: Optional[Dict] = None
+        self._sysroot_cache: Dict[str, Tuple[float, Dict]] = {}
+        # GETs currently on the wire, so concurrent callers can share one response
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._dispatch = {
+            'GET': lambda url, data=None: self.session.get(
+                url, auth=self.auth, timeout=REQUEST_TIMEOUT),
+            'POST': lambda url, data=None: self.session.post(
+                url, json=data, auth=self.auth, timeout=REQUEST_TIMEOUT)
+        }
+
+    def close(self):
+        """Release the client; the shared per-host session stays open for other clients"""
+        # Shared sessions are closed once, at interpreter exit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _send_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None) -> Dict:
-        """Send request to iLO REST API"""
-        url = f"{self.base_url}/{endpoint}"
+        """Send request to the Redfish API (endpoint may be relative or an @odata.id path)"""
+        if method != 'GET':
+            return self._send_uncached(endpoint, method, data)
+
+        if self.cache is not None:
+            cached = self.cache.get(self.host, endpoint)
+            if cached is not None:
+                return cached
+
+        # Single-flight: identical concurrent GETs wait on the first caller's request
+        with self._inflight_lock:
+            pending = self._inflight.get(endpoint)
+            if pending is None:
+                future = self._inflight[endpoint] = Future()
+        if pending is not None:
+            return pending.result()
+
         try:
-            if method == 'GET':
-                response = self.session.get(url)
-            elif method == 'POST':
-                response = self.session.post(url, json=data)
+            try:
+                result = self._send_uncached(endpoint, method, data)
+            except Exception as e:
+                stale = self.cache.get_stale(self.host, endpoint) if self.cache is not None else None
+                if stale is None:
+                    raise
+                logger.warning("Using stale cached %s for %s: %s", endpoint, self.host, e)
+                result = stale
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                if self.cache is not None:
+                    self.cache.set(self.host, endpoint, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(endpoint, None)
+
+    def _send_uncached(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None) -> Dict:
+        """Perform the HTTP request and decode the JSON response"""
+        send = self._dispatch.get(method)
+        if send is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
+        url = _resolve_url(self.host, endpoint)
+        try:
+            response = send(url, data)
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to connect to iLO: {str(e)}")
+            raise BMCError(f"Failed to connect to {self.SERVICE_NAME}: {str(e)}") from e
+
+    def _fetch_members(self, members: List[Dict]) -> List[Tuple[str, Union[Dict, Exception]]]:
+        """Fetch collection members concurrently, returning (uri, data or error) in member order"""
+        uris = [member.get('@odata.id', '') for member in members]
+        uris = [uri for uri in uris if uri]
+        if not uris:
+            return []
+
+        def fetch(uri: str) -> Tuple[str, Union[Dict, Exception]]:
+            try:
+                return uri, self._send_request(uri)
+            except Exception as e:
+                return uri, e
+
+        return list(_member_executor().map(fetch, uris))
+
+    def _get_system(self, select: Optional[Tuple[str, ...]] = None) -> Dict:
+        """Return the system resource, reusing a copy fetched within the last SYSTEM_CACHE_TTL seconds
+
+        When select is given and the service supports $select, only those properties are requested.
+        """
+        endpoint = self.SYSTEM_PATH
+        if select and self._supports_select():
+            endpoint = f"{endpoint}?$select={','.join(select)}"
+
+        now = time.monotonic()
+        cached = self._sysroot_cache.get(endpoint)
+        if cached and now - cached[0] < SYSTEM_CACHE_TTL:
+            return cached[1]
+        system_data = self._send_request(endpoint)
+        self._sysroot_cache[endpoint] = (now, system_data)
+        return system_data
+
+    def _get_protocol_features(self) -> Dict:
+        """Read the service root's ProtocolFeaturesSupported once per client"""
+        if self._protocol_features is None:
+            try:
+                service_root = self._send_request('')
+                self._protocol_features = service_root.get('ProtocolFeaturesSupported', {})
+            except Exception as e:
+                logger.debug("Could not read ProtocolFeaturesSupported: %s", e)
+                self._protocol_features = {}
+        return self._protocol_features
+
+    def _supports_expand(self) -> bool:
+        """Check whether the service accepts $expand=.($levels=1)"""
+        expand = self._get_protocol_features().get('ExpandQuery', {})
+        return bool(expand.get('NoLinks') and expand.get('Levels'))
+
+    def _supports_select(self) -> bool:
+        """Check whether the service accepts $select"""
+        return bool(self._get_protocol_features().get('SelectQuery'))
+
+    def _get_collection_members(self, collection_uri: str) -> List[Tuple[str, Union[Dict, Exception]]]:
+        """Fetch a collection's members, inlined in one request when $expand is supported"""
+        collection = None
+        if self._supports_expand():
+            try:
+                collection = self._send_request(f"{collection_uri}?$expand=.($levels=1)")
+            except BMCError as e:
+                # Advertised but rejected (e.g. 400/501); fetch the members one by one instead
+                logger.warning("%s rejected $expand on %s, fetching members individually: %s",
+                               self.host, collection_uri, e)
+            else:
+                members = collection.get('Members', [])
+                # Some firmware accepts the query but still returns bare links
+                if all(len(member) > 1 for member in members):
+                    return [(member.get('@odata.id', ''), member) for member in members]
+        if collection is None:
+            collection = self._send_request(collection_uri)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Collection %s data:\n%s", collection_uri, _pretty(collection))
+        return self._fetch_members(collection.get('Members', []))
+
+class ILOClient(RedfishClient):
+    SERVICE_NAME = 'iLO'
+    SYSTEM_PATH = 'Systems/1'
+
+    # The only Systems/1 properties read unless the full-payload MAC scan is needed
+    SYSTEM_SELECT = ('HostName', 'EthernetInterfaces', 'NetworkInterfaces')
 
     def get_network_info(self) -> Dict:
         """Get network information from iLO including MAC addresses"""
         try:
             # Get system and network data
-            system_data = self._send_request('Systems/1')
+            system_data = self._get_system(select=self.SYSTEM_SELECT)
             network_info = {
                 'hostname': system_data.get('HostName', ''),
                 'interfaces': []
             }
 
-            print(f"System data keys: {list(system_data.keys())}")  # Debug output
-
-            print("\nSystem NetworkInterfaces data:")
-            print(json.dumps(system_data.get('NetworkInterfaces', {}), indent=2))
-            print("\nSystem EthernetInterfaces data:")
-            print(json.dumps(system_data.get('EthernetInterfaces', {}), indent=2))
+            # Only pay for serializing the payloads when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("System data keys: %s", list(system_data.keys()))
+                logger.debug("System NetworkInterfaces data:\n%s",
+                             _pretty(system_data.get('NetworkInterfaces', {})))
+                logger.debug("System EthernetInterfaces data:\n%s",
+                             _pretty(system_data.get('EthernetInterfaces', {})))
 
             # First try: Check EthernetInterfaces
             if 'EthernetInterfaces' in system_data and '@odata.id' in system_data['EthernetInterfaces']:
                 try:
                     eth_uri = system_data['EthernetInterfaces']['@odata.id']
-                    print(f"\nTrying EthernetInterfaces URI: {eth_uri}")
-                    eth_data = self._send_request(eth_uri.split('/redfish/v1/')[-1])
-                    print(f"EthernetInterfaces data: {json.dumps(eth_data, indent=2)}")
-                    if 'Members' in eth_data:
-                        for member in eth_data['Members']:
-                            try:
-                                member_uri = member.get('@odata.id', '')
-                                if member_uri:
-                                    interface = self._send_request(member_uri.split('/redfish/v1/')[-1])
-                                    print(f"Interface data keys: {list(interface.keys())}")
-                                    # Try to find MAC address in the interface data
-                                    mac = None
-                                    name = interface.get('Name', '')
-                                    
-                                    # Look for MAC in different possible locations
-                                    if 'MacAddress' in interface:
-                                        mac = interface['MacAddress']
-                                    elif 'MACAddress' in interface:
-                                        mac = interface['MACAddress']
-                                    elif 'PhysicalPorts' in interface:
-                                        for port in interface['PhysicalPorts']:
-                                            if 'MacAddress' in port:
-                                                mac = port['MacAddress']
-                                                name = f"{name}-{port.get('Name', '')}"
-                                                break
-                                    
-                                    if mac:
-                                        network_info['interfaces'].append({
-                                            'name': name,
-                                            'mac_address': mac.upper(),
-                                            'status': interface.get('Status', {}).get('State', 'OK')
-                                        })
-                            except Exception as e:
-                                print(f"Error processing interface {member_uri}: {str(e)}")
-                except Exception as e:
-                    print(f"Error accessing NetworkInterfaces: {str(e)}")
+                    logger.debug("Trying EthernetInterfaces URI: %s", eth_uri)
+                    # Members are inlined via $expand or fetched in parallel
+                    for member_uri, interface in self._get_collection_members(eth_uri):
+                        if isinstance(interface, Exception):
+                            logger.warning("Error processing interface %s on %s: %s", member_uri, self.host, interface)
+                            continue
+                        try:
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Interface data keys: %s", list(interface.keys()))
+                            # Try to find MAC address in the interface data
+                            mac = None
+                            name = interface.get('Name', '')
+                            
+                            # Look for MAC in different possible locations
+                            if 'MacAddress' in interface:
+                                mac = interface['MacAddress']
+                            elif 'MACAddress' in interface:
+                                mac = interface['MACAddress']
+                            elif 'PhysicalPorts' in interface:
+                                for port in interface['PhysicalPorts']:
+                                    if 'MacAddress' in port:
+                                        mac = port['MacAddress']
+                                        name = f"{name}-{port.get('Name', '')}"
+                                        break
+                            
+                            if mac:
+                                network_info['interfaces'].append(NetworkInterface(
+                                    name=name,
+                                    mac_address=_norm_mac(mac),
+                                    status=interface.get('Status', {}).get('State', 'OK')
+                                ))
+                        except _PAYLOAD_ERRORS as e:
+                            logger.warning("Error processing interface %s on %s: %s", member_uri, self.host, e)
+                except _NETWORK_INFO_ERRORS as e:
+                    logger.warning("Error accessing EthernetInterfaces on %s: %s", self.host, e)
 
             # Second try: Check NetworkInterfaces
             if not network_info['interfaces'] and 'NetworkInterfaces' in system_data:
                 try:
                     if '@odata.id' in system_data['NetworkInterfaces']:
                         net_uri = system_data['NetworkInterfaces']['@odata.id']
-                        print(f"\nTrying NetworkInterfaces URI: {net_uri}")
-                        net_data = self._send_request(net_uri.split('/redfish/v1/')[-1])
-                        print(f"NetworkInterfaces data: {json.dumps(net_data, indent=2)}")
-                        if 'Members' in net_data:
-                            for member in net_data['Members']:
-                                try:
-                                    member_uri = member.get('@odata.id', '')
-                                    if member_uri:
-                                        interface = self._send_request(member_uri.split('/redfish/v1/')[-1])
-                                        print(f"\nInterface data: {json.dumps(interface, indent=2)}")
-                                        if 'MACAddress' in interface:
-                                            network_info['interfaces'].append({
-                                                'name': interface.get('Name', ''),
-                                                'mac_address': interface['MACAddress'].upper(),
-                                                'status': 'OK'
-                                            })
-                                except Exception as e:
-                                    print(f"Error processing interface {member_uri}: {str(e)}")
-                except Exception as e:
-                    print(f"Error accessing NetworkInterfaces: {str(e)}")
+                        logger.debug("Trying NetworkInterfaces URI: %s", net_uri)
+                        # Same concurrent (or $expand) member fetch as EthernetInterfaces
+                        for member_uri, interface in self._get_collection_members(net_uri):
+                            if isinstance(interface, Exception):
+                                logger.warning("Error processing interface %s on %s: %s",
+                                               member_uri, self.host, interface)
+                                continue
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Interface data:\n%s", _pretty(interface))
+                            if 'MACAddress' in interface:
+                                network_info['interfaces'].append(NetworkInterface(
+                                    name=interface.get('Name', ''),
+                                    mac_address=_norm_mac(interface['MACAddress']),
+                                    status='OK'
+                                ))
+                except _NETWORK_INFO_ERRORS as e:
+                    logger.warning("Error accessing NetworkInterfaces on %s: %s", self.host, e)
 
             # Third try: Look for any MAC addresses in system data
             if not network_info['interfaces']:
-                def find_mac_addresses(data, prefix=''):
-                    if isinstance(data, dict):
-                        for key, value in data.items():
-                            if isinstance(value, str) and ('MAC' in key.upper()):
-                                network_info['interfaces'].append({
-                                    'name': f"{prefix}{key.replace('MAC', '').replace('Address', '')}",
-                                    'mac_address': value.upper(),
-                                    'status': 'OK'
-                                })
-                            elif isinstance(value, (dict, list)):
-                                new_prefix = f"{prefix}{key}." if prefix else f"{key}."
-                                find_mac_addresses(value, new_prefix)
-                    elif isinstance(data, list):
-                        for i, item in enumerate(data):
-                            find_mac_addresses(item, f"{prefix}[{i}].")
-
-                find_mac_addresses(system_data)
+                network_info['interfaces'].extend(_find_mac_addresses(self._get_system()))
             
             return network_info
             
-        except Exception as e:
-            print(f"Error getting iLO network info: {str(e)}")
+        except _NETWORK_INFO_ERRORS:
+            logger.exception("iLO network info failed for %s", self.host)
             return {'hostname': '', 'interfaces': []}
 
-class IDRACClient(BMCClient):
-    def __init__(self, host: str, username: str, password: str):
-        self.host = host
-        self.username = username
-        self.password = password
-        self.session = requests.Session()
-        self.session.verify = False
-        self.session.auth = (username, password)
-        self.base_url = f"https://{host}/redfish/v1"
+class IDRACClient(RedfishClient):
+    SERVICE_NAME = 'iDRAC'
+    SYSTEM_PATH = 'Systems/System.Embedded.1'
 
-    def _send_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None) -> Dict:
-        """Send request to iDRAC Redfish API"""
-        url = f"{self.base_url}/{endpoint}"
-        try:
-            if method == 'GET':
-                response = self.session.get(url)
-            elif method == 'POST':
-                response = self.session.post(url, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to connect to iDRAC: {str(e)}")
+    # Only HostName is read from the system resource
+    SYSTEM_SELECT = ('HostName',)
 
     def get_network_info(self) -> Dict:
         """Get network information from iDRAC including MAC addresses"""
         try:
             # Get system information
-            system_data = self._send_request('Systems/System.Embedded.1')
+            system_data = self._get_system(select=self.SYSTEM_SELECT)
             
             network_info = {
                 'hostname': system_data.get('HostName', ''),
                 'interfaces': []
             }
             
-            # Get network interfaces
-            ethernet_interfaces = self._send_request('Systems/System.Embedded.1/EthernetInterfaces')
-            
-            for interface in ethernet_interfaces.get('Members', []):
-                interface_uri = interface.get('@odata.id', '')
-                if interface_uri:
-                    interface_data = self._send_request(interface_uri.split('/redfish/v1/')[-1])
-                    network_info['interfaces'].append({
-                        'name': interface_data.get('Name', ''),
-                        'mac_address': interface_data.get('MacAddress', '').upper(),
-                        'status': interface_data.get('Status', {}).get('State', 'Unknown')
-                    })
+            # Members arrive inlined via $expand; older firmware falls back to parallel GETs
+            ethernet_uri = f"{self.SYSTEM_PATH}/EthernetInterfaces"
+            for interface_uri, interface_data in self._get_collection_members(ethernet_uri):
+                if isinstance(interface_data, Exception):
+                    logger.warning("Error processing interface %s on %s: %s",
+                                   interface_uri, self.host, interface_data)
+                    continue
+                network_info['interfaces'].append(NetworkInterface(
+                    name=interface_data.get('Name', ''),
+                    mac_address=_norm_mac(interface_data.get('MacAddress', '')),
+                    status=interface_data.get('Status', {}).get('State', 'Unknown')
+                ))
             
             return network_info
             
-        except Exception as e:
-            print(f"Error getting iDRAC network info: {str(e)}")
+        except _NETWORK_INFO_ERRORS:
+            logger.exception("iDRAC network info failed for %s", self.host)
             return {'hostname': '', 'interfaces': []}
 
-def create_bmc_client(host: str, username: str, password: str, bmc_type: str) -> BMCClient:
+def create_bmc_client(host: str, username: str, password: str, bmc_type: str,
+                      cache: Optional[ResponseCache] = None,
+                      cert_fingerprint: Optional[str] = None) -> BMCClient:
     """Factory function to create appropriate BMC client"""
     if bmc_type.lower() == 'ilo':
-        return ILOClient(host, username, password)
+        return ILOClient(host, username, password, cache, cert_fingerprint)
     elif bmc_type.lower() == 'idrac':
-        return IDRACClient(host, username, password)
+        return IDRACClient(host, username, password, cache, cert_fingerprint)
     else:
         raise ValueError(f"Unsupported BMC type: {bmc_type}")
@@ -0,0 +1,55 @@
+import os
+import time
+from typing import Any, Optional, Tuple
+from diskcache import Cache
+
+DEFAULT_CACHE_DIR = os.path.expanduser('~/.cache/switch_mapper')
+
+# Named freshness policies (seconds) accepted in place of an explicit TTL
+TTL_POLICIES = {
+    'short': 60,
+    'normal': 3600,
+    'long': 86400
+}
+
+# Entries are kept this long (seconds) past freshness so they can stand in when a device is unreachable
+STALE_RETENTION = 7 * 86400
+
+class ResponseCache:
+    """Disk-backed cache of API responses keyed by (host, endpoint)"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: int = TTL_POLICIES['normal']):
+        self.ttl = ttl
+        self._cache = Cache(directory)
+
+    def _get_entry(self, host: str, endpoint: str) -> Optional[Tuple[float, Any]]:
+        """Return the (fetched_at, body) entry, ignoring entries in an older format"""
+        entry = self._cache.get((host, endpoint))
+        return entry if isinstance(entry, tuple) else None
+
+    def get(self, host: str, endpoint: str, ttl: Optional[int] = None) -> Optional[Any]:
+        """Return the cached response if younger than ttl (default: the configured TTL), else None"""
+        entry = self._get_entry(host, endpoint)
+        if entry is None:
+            return None
+        fetched_at, body = entry
+        max_age = self.ttl if ttl is None else ttl
+        if time.time() - fetched_at >= max_age:
+            return None
+        return body
+
+    def get_stale(self, host: str, endpoint: str) -> Optional[Any]:
+        """Return the last cached response regardless of age, or None"""
+        entry = self._get_entry(host, endpoint)
+        return entry[1] if entry is not None else None
+
+    def set(self, host: str, endpoint: str, value: Any):
+        """Store a response with the time it was fetched"""
+        self._cache.set(
+            (host, endpoint),
+            (time.time(), value),
+            expire=max(self.ttl, TTL_POLICIES['long']) + STALE_RETENTION
+        )
+
+    def close(self):
+        self._cache.close()
@@ -1,9 +1,22 @@
+import functools
 import os
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
 import yaml
 
-@dataclass
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+@functools.lru_cache(maxsize=8)
+def _parse(path: str, mtime: float) -> Dict:
+    """Parse a YAML file; mtime is part of the cache key so edits are picked up"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
+@dataclass(slots=True, frozen=True)
 class SwitchConfig:
     hostname: str
     ip: str
@@ -11,13 +24,15 @@ class SwitchConfig:
     password: str
     use_nxapi: bool = True
     port: int = 80
+    protocol_mode: str = 'auto'  # 'auto', 'rpc' or 'ins'
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BMCConfig:
     ip: str
     username: str
     password: str
     type: str  # 'ilo' or 'idrac'
+    cert_fingerprint: Optional[str] = None  # SHA-256 of the BMC's TLS certificate
 
 class Config:
     def __init__(self, config_file: str = 'config.yaml'):
@@ -31,8 +46,7 @@ class Config:
             # Create default config if not exists
             self.create_default_config()
         
-        with open(self.config_file, 'r') as f:
-            config = yaml.safe_load(f)
+        config = _parse(self.config_file, os.path.getmtime(self.config_file))
 
         self.switches = [
             SwitchConfig(**switch) for switch in config.get('switches', [])
@@ -1,114 +1,235 @@
-from typing import Dict, List, Optional
-import graphviz
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import io
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
 from .config import Config, SwitchConfig, BMCConfig
-from .nxapi_client import NXAPIClient, PortConnection
-from .bmc_client import create_bmc_client
+from .nxapi_client import NXAPIClient, NXAPIError, NXAPITransient, PortConnection
+from .bmc_client import BMCClient, create_bmc_client
+from .cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of switches and BMCs queried at the same time
+SWITCH_WORKERS = 32
+BMC_WORKERS = 32
+
+# Text report sections in output order; any other device_type is reported as unknown
+_REPORT_SECTIONS = (
+    ('switch', 'Connected Switches'),
+    ('server', 'Connected Servers'),
+    ('unknown', 'Unknown Devices')
+)
+_KNOWN_DEVICE_TYPES = frozenset(device_type for device_type, _ in _REPORT_SECTIONS)
+
+# Graphviz node attributes per device type
+_SW_ATTRS = {'style': 'filled', 'fillcolor': 'lightblue'}
+_SRV_ATTRS = {'style': 'filled', 'fillcolor': 'lightgreen'}
+_UNK_ATTRS = {'style': 'filled', 'fillcolor': 'lightgray'}
+
+_NON_HEX = re.compile(r'[^0-9A-Fa-f]')
+
+def _mac_to_int(mac: str) -> Optional[int]:
+    """Parse a MAC in any common notation (aa:bb:.., aa-bb-.., aabb.ccdd.eeff) to an integer key"""
+    digits = _NON_HEX.sub('', mac)
+    if len(digits) != 12:
+        return None
+    return int(digits, 16)
+
+def _quiet(*args, **kwargs):
+    """Stand-in for print when progress output is disabled"""
+    pass
 
 class SwitchMapper:
-    def __init__(self, config_file: str = 'config.yaml'):
+    def __init__(self, config_file: str = 'config.yaml', cache: Optional[ResponseCache] = None,
+                 verbose: bool = False):
         self.config = Config(config_file)
+        self.cache = cache
+        # Progress messages are only printed when verbose; errors always go to the logger
+        self._log = print if verbose else _quiet
         self.switch_connections: Dict[str, List[PortConnection]] = {}
-        self.bmc_mac_to_hostname: Dict[str, str] = {}
+        # Keyed by _mac_to_int so switch and BMC notations compare equal
+        self.bmc_mac_to_hostname: Dict[int, str] = {}
+        # Clients are kept across gather calls so repeated polls reuse warm connections
+        self._nx_clients: Dict[Tuple[str, int], NXAPIClient] = {}
+        self._bmc_clients: Dict[Tuple[str, str], BMCClient] = {}
 
-    def gather_switch_data(self):
-        """Gather data from all configured switches"""
-        for switch_config in self.config.switches:
-            print(f"\nGathering data from switch: {switch_config.hostname} ({switch_config.ip})")
-            client = NXAPIClient(
+    def _nx_client(self, switch_config: SwitchConfig) -> NXAPIClient:
+        """Return the NX-API client for a switch, creating it on first use"""
+        key = (switch_config.ip, switch_config.port)
+        client = self._nx_clients.get(key)
+        if client is None:
+            client = self._nx_clients[key] = NXAPIClient(
                 switch_config.ip,
                 switch_config.username,
                 switch_config.password,
-                switch_config.port
+                switch_config.port,
+                self.cache,
+                switch_config.protocol_mode
             )
+        return client
 
-            connections = []
-            
-            # Get LLDP neighbors
-            print("\nGathering LLDP neighbors...")
-            lldp_neighbors = client.get_lldp_neighbors()
-            print(f"Found {len(lldp_neighbors)} LLDP neighbors")
-            connections.extend(lldp_neighbors)
-            
-            # Get MAC address table entries
-            print("\nGathering MAC address table...")
-            mac_entries = client.get_mac_address_table()
-            print(f"Found {len(mac_entries)} MAC addresses")
-            
-            # Debug print MAC addresses
-            print("\nMAC addresses found:")
-            for entry in mac_entries:
-                print(f"Interface: {entry.interface}, MAC: {entry.mac_address}")
-            
-            # Add interface status
-            interface_status = client.get_interface_status()
-            
-            # Merge MAC entries with existing connections
-            print("\nMerging MAC entries with neighbor data...")
-            for entry in mac_entries:
-                # Check if we already have this interface from CDP/LLDP
-                existing = next(
-                    (c for c in connections if c.interface == entry.interface),
-                    None
-                )
-                if existing:
-                    print(f"Adding MAC {entry.mac_address} to existing connection on {entry.interface}")
-                    existing.mac_address = entry.mac_address
-                else:
-                    print(f"Adding new connection for MAC {entry.mac_address} on {entry.interface}")
-                    connections.append(entry)
+    def _bmc_client(self, bmc_config: BMCConfig) -> BMCClient:
+        """Return the BMC client for a BMC, creating it on first use"""
+        key = (bmc_config.ip, bmc_config.type)
+        client = self._bmc_clients.get(key)
+        if client is None:
+            client = self._bmc_clients[key] = create_bmc_client(
+                bmc_config.ip,
+                bmc_config.username,
+                bmc_config.password,
+                bmc_config.type,
+                self.cache,
+                bmc_config.cert_fingerprint
+            )
+        return client
+
+    def close(self):
+        """Release the clients kept between gather calls"""
+        for client in self._bmc_clients.values():
+            client.close()
+        for client in self._nx_clients.values():
+            client.close()
+        self._bmc_clients.clear()
+        self._nx_clients.clear()
+
+    def _gather_one_switch(self, switch_config: SwitchConfig) -> Tuple[str, List[PortConnection]]:
+        """Gather neighbor and MAC table data from a single switch"""
+        self._log(f"\nGathering data from switch: {switch_config.hostname} ({switch_config.ip})")
+        client = self._nx_client(switch_config)
+
+        self._log(f"\nGathering LLDP neighbors and MAC address table from {switch_config.hostname}...")
+        try:
+            # One round trip for every command when the switch accepts a batch
+            collected = client.collect_all()
+            lldp_neighbors = collected['lldp']
+            mac_entries = collected['mac']
+        except NXAPITransient:
+            # An unreachable or throttling switch won't answer the per-command queries either
+            raise
+        except NXAPIError as e:
+            logger.debug("Batched collection failed on %s, querying per command: %s",
+                         switch_config.hostname, e)
+            # LLDP and MAC table queries are independent, so issue them at the same time
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                lldp_future = executor.submit(client.get_lldp_neighbors)
+                mac_future = executor.submit(client.get_mac_address_table)
+                lldp_neighbors = lldp_future.result()
+                mac_entries = mac_future.result()
 
-            self.switch_connections[switch_config.hostname] = connections
+        connections = list(lldp_neighbors)
+        self._log(f"Found {len(lldp_neighbors)} LLDP neighbors on {switch_config.hostname}")
+        self._log(f"Found {len(mac_entries)} MAC addresses on {switch_config.hostname}")
+
+        # Merge MAC entries with existing connections
+        self._log(f"\nMerging MAC entries with neighbor data on {switch_config.hostname}...")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # Index connections by interface so each MAC entry is merged in O(1)
+        by_interface = {}
+        for conn in connections:
+            by_interface.setdefault(conn.interface, conn)
+        for entry in mac_entries:
+            # Check if we already have this interface from CDP/LLDP
+            existing = by_interface.get(entry.interface)
+            if existing:
+                if debug:
+                    logger.debug("Adding MAC %s to existing connection on %s", entry.mac_address, entry.interface)
+                existing.mac_address = entry.mac_address
+            else:
+                if debug:
+                    logger.debug("Adding new connection for MAC %s on %s", entry.mac_address, entry.interface)
+                connections.append(entry)
+                by_interface[entry.interface] = entry
+
+        return switch_config.hostname, connections
+
+    def gather_switch_data(self):
+        """Gather data from all configured switches"""
+        if not self.config.switches:
+            return
+
+        # Poll switches concurrently, then store results in config order
+        with ThreadPoolExecutor(max_workers=min(SWITCH_WORKERS, len(self.config.switches))) as executor:
+            futures = [
+                executor.submit(self._gather_one_switch, switch_config)
+                for switch_config in self.config.switches
+            ]
+            for future in futures:
+                hostname, connections = future.result()
+                self.switch_connections[hostname] = connections
+
+    def _fetch_bmc_network_info(self, bmc_config: BMCConfig) -> Dict:
+        """Query a single BMC/iLO for its network information"""
+        return self._bmc_client(bmc_config).get_network_info()
 
     def gather_bmc_data(self):
         """Gather MAC address data from BMC/iLO interfaces"""
-        print("\nGathering BMC/iLO data...")
-        for bmc_config in self.config.bmcs:
-            try:
-                print(f"\nConnecting to BMC/iLO at {bmc_config.ip}")
-                client = create_bmc_client(
-                    bmc_config.ip,
-                    bmc_config.username,
-                    bmc_config.password,
-                    bmc_config.type
-                )
-                
-                network_info = client.get_network_info()
-                hostname = network_info['hostname']
-                print(f"Found hostname: {hostname}")
-                
-                # Map each MAC address to the hostname
-                print("Network interfaces found:")
-                for interface in network_info['interfaces']:
-                    if interface['mac_address']:
-                        print(f"Interface: {interface['name']}, MAC: {interface['mac_address']}")
-                        self.bmc_mac_to_hostname[interface['mac_address']] = hostname
-                        
-            except Exception as e:
-                print(f"Error gathering BMC data from {bmc_config.ip}: {str(e)}")
+        self._log("\nGathering BMC/iLO data...")
+        if not self.config.bmcs:
+            return
+
+        # Query all BMCs concurrently, then merge results in config order
+        with ThreadPoolExecutor(max_workers=min(BMC_WORKERS, len(self.config.bmcs))) as executor:
+            futures = []
+            for bmc_config in self.config.bmcs:
+                self._log(f"\nConnecting to BMC/iLO at {bmc_config.ip}")
+                futures.append(executor.submit(self._fetch_bmc_network_info, bmc_config))
+
+            for bmc_config, future in zip(self.config.bmcs, futures):
+                try:
+                    network_info = future.result()
+                    hostname = network_info['hostname']
+                    self._log(f"\nFound hostname: {hostname} ({bmc_config.ip}), "
+                              f"{len(network_info['interfaces'])} interfaces")
+                    
+                    # Map each MAC address to the hostname
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    for interface in network_info['interfaces']:
+                        key = _mac_to_int(interface.mac_address) if interface.mac_address else None
+                        if key is not None:
+                            if debug:
+                                logger.debug("Interface: %s, MAC: %s", interface.name, interface.mac_address)
+                            self.bmc_mac_to_hostname[key] = hostname
+                            
+                except Exception as e:
+                    logger.warning("Error gathering BMC data from %s: %s", bmc_config.ip, e)
 
     def update_unknown_devices(self):
         """Update unknown devices with hostname information from BMCs"""
-        print("\nCross-referencing MAC addresses with BMC/iLO data...")
-        print("\nKnown BMC MAC addresses:")
-        for mac, hostname in self.bmc_mac_to_hostname.items():
-            print(f"MAC: {mac} -> Hostname: {hostname}")
+        self._log("\nCross-referencing MAC addresses with BMC/iLO data...")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            for mac, hostname in self.bmc_mac_to_hostname.items():
+                logger.debug("Known BMC MAC: %012x -> Hostname: %s", mac, hostname)
             
+        matched = 0
         for switch_hostname, connections in self.switch_connections.items():
-            print(f"\nChecking connections on switch {switch_hostname}:")
             for conn in connections:
                 if conn.device_type == 'unknown' and conn.mac_address:
-                    print(f"Checking MAC {conn.mac_address} on {conn.interface}")
                     # Check if we have hostname information for this MAC
-                    hostname = self.bmc_mac_to_hostname.get(conn.mac_address)
+                    key = _mac_to_int(conn.mac_address)
+                    hostname = self.bmc_mac_to_hostname.get(key) if key is not None else None
                     if hostname:
-                        print(f"Found match! Updating to server {hostname}")
+                        if debug:
+                            logger.debug("%s %s: MAC %s matches server %s",
+                                         switch_hostname, conn.interface, conn.mac_address, hostname)
                         conn.connected_device = hostname
                         conn.device_type = 'server'
-                    else:
-                        print("No matching BMC/iLO MAC address found")
+                        matched += 1
+                    elif debug:
+                        logger.debug("%s %s: no BMC/iLO match for MAC %s",
+                                     switch_hostname, conn.interface, conn.mac_address)
+        self._log(f"Matched {matched} connections to servers")
 
     def generate_diagram(self, output_file: str = 'network_diagram') -> str:
         """Generate network diagram using graphviz"""
+        # Imported here so text-only runs don't pay for loading graphviz, or need it installed
+        try:
+            import graphviz
+        except ImportError:
+            logger.warning("graphviz is not installed, skipping the network diagram")
+            return ""
         dot = graphviz.Digraph(comment='Network Diagram')
         dot.attr(rankdir='TB')
         
@@ -117,7 +238,10 @@ class SwitchMapper:
         
         # Add switches
         for switch_hostname in self.switch_connections.keys():
-            dot.node(switch_hostname, f"{switch_hostname}\\nNexus 9K", style='filled', fillcolor='lightblue')
+            dot.node(switch_hostname, f"{switch_hostname}\\nNexus 9K", **_SW_ATTRS)
+        
+        # Server/unknown nodes already emitted, so devices seen on several ports appear once
+        added_nodes = set()
         
         # Add connections and servers
         for switch_hostname, connections in self.switch_connections.items():
@@ -126,11 +250,12 @@ class SwitchMapper:
                     continue
                 
                 # Format connection label
-                label = f"{conn.interface}"
+                label_parts = [conn.interface]
                 if conn.mac_address:
-                    label += f"\\nMAC: {conn.mac_address}"
+                    label_parts.append(f"MAC: {conn.mac_address}")
                 if conn.protocol:
-                    label += f"\\n{conn.protocol}"
+                    label_parts.append(conn.protocol)
+                label = "\\n".join(label_parts)
                 
                 # Add node and edge based on device type
                 if conn.device_type == 'switch':
@@ -138,12 +263,16 @@ class SwitchMapper:
                     dot.edge(switch_hostname, conn.connected_device, label=label)
                 elif conn.device_type == 'server':
                     # Add server node and connection
-                    dot.node(conn.connected_device, conn.connected_device, style='filled', fillcolor='lightgreen')
+                    if conn.connected_device not in added_nodes:
+                        added_nodes.add(conn.connected_device)
+                        dot.node(conn.connected_device, conn.connected_device, **_SRV_ATTRS)
                     dot.edge(switch_hostname, conn.connected_device, label=label)
                 else:
                     # Add unknown device
                     node_name = f"unknown_{conn.interface}"
-                    dot.node(node_name, f"Unknown Device\\n{conn.mac_address if conn.mac_address else ''}", style='filled', fillcolor='lightgray')
+                    if node_name not in added_nodes:
+                        added_nodes.add(node_name)
+                        dot.node(node_name, f"Unknown Device\\n{conn.mac_address if conn.mac_address else ''}", **_UNK_ATTRS)
                     dot.edge(switch_hostname, node_name, label=label)
         
         # Save diagram
@@ -151,53 +280,47 @@ class SwitchMapper:
             dot.render(output_file, format='png', cleanup=True)
             return f"{output_file}.png"
         except Exception as e:
-            print(f"Error generating diagram: {str(e)}")
+            logger.error("Error generating diagram: %s", e)
             return ""
 
     def generate_text_report(self) -> str:
         """Generate text-based report of connections"""
-        report = []
-        report.append("Network Connection Report")
-        report.append("=" * 50)
+        buf = io.StringIO()
+        w = buf.write
+        w("Network Connection Report\n")
+        w("=" * 50)
         
         for switch_hostname, connections in self.switch_connections.items():
-            report.append(f"\nSwitch: {switch_hostname}")
-            report.append("-" * 30)
-            
-            # Group by device type
-            switches = []
-            servers = []
-            unknown = []
+            w("\n\nSwitch: ")
+            w(switch_hostname)
+            w("\n")
+            w("-" * 30)
             
+            # Group by device type in a single pass
+            buckets = defaultdict(list)
             for conn in connections:
-                line = f"  {conn.interface}: "
+                parts = ["  ", conn.interface, ": "]
                 if conn.connected_device:
-                    line += f"{conn.connected_device} "
+                    parts += (conn.connected_device, " ")
                 if conn.mac_address:
-                    line += f"(MAC: {conn.mac_address}) "
+                    parts += ("(MAC: ", conn.mac_address, ") ")
                 if conn.protocol:
-                    line += f"[{conn.protocol}]"
+                    parts += ("[", conn.protocol, "]")
                 
-                if conn.device_type == 'switch':
-                    switches.append(line)
-                elif conn.device_type == 'server':
-                    servers.append(line)
-                else:
-                    unknown.append(line)
-            
-            if switches:
-                report.append("\n  Connected Switches:")
-                report.extend(switches)
-            
-            if servers:
-                report.append("\n  Connected Servers:")
-                report.extend(servers)
+                section = conn.device_type if conn.device_type in _KNOWN_DEVICE_TYPES else 'unknown'
+                buckets[section].append("".join(parts))
             
-            if unknown:
-                report.append("\n  Unknown Devices:")
-                report.extend(unknown)
+            for device_type, title in _REPORT_SECTIONS:
+                lines = buckets[device_type]
+                if lines:
+                    w("\n\n  ")
+                    w(title)
+                    w(":")
+                    for line in lines:
+                        w("\n")
+                        w(line)
         
-        return "\n".join(report)
+        return buf.getvalue()
 
     def map_network(self, output_file: str = 'network_diagram') -> tuple[str, str]:
         """Map the network and generate both diagram and text report"""
@@ -212,5 +335,5 @@ class SwitchMapper:
             return diagram_path, text_report
             
         except Exception as e:
-            print(f"Error mapping network: {str(e)}")
+            logger.error("Error mapping network: %s", e)
             return "", ""
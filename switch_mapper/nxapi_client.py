@@ -1,10 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+import logging
+import re
+from sys import intern
+import threading
 import time
+import urllib3
+from .cache import ResponseCache
 
-@dataclass
+# orjson encodes and decodes NX-API payloads much faster; stdlib json keeps things working without it
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+# ijson is optional; with it, uncached MAC tables are parsed row by row off the socket
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Disable SSL warnings for self-signed certificates
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response stays fresh, by command prefix; MAC tables churn fastest
+COMMAND_TTLS = {
+    'show mac address-table': 5,
+    'show interface status': 30,
+    'show lldp neighbors': 60
+}
+DEFAULT_COMMAND_TTL = 30
+
+def _command_ttl(command: str) -> int:
+    """Return the cache lifetime for a single show command"""
+    return next(
+        (ttl for prefix, ttl in COMMAND_TTLS.items() if command.startswith(prefix)),
+        DEFAULT_COMMAND_TTL
+    )
+
+# TABLE_/ROW_ keys of each show command's JSON output
+LLDP_TABLE, LLDP_ROW = 'TABLE_nbor_detail', 'ROW_nbor_detail'
+MAC_TABLE, MAC_ROW = 'TABLE_mac_address', 'ROW_mac_address'
+IF_TABLE, IF_ROW = 'TABLE_interface', 'ROW_interface'
+
+# Separators in the NX-OS (aabb.ccdd.eeff) and colon/dash MAC notations
+_MAC_STRIP = str.maketrans('', '', '.:- ')
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+# Cisco switch platform IDs; an LLDP neighbor whose system description names one is a switch
+_SWITCH_PREFIXES = ('N9K', 'N3K', 'N5K', 'N7K', 'C9500', 'C9300')
+# One alternation scans the description for every platform in a single C-level pass
+_SWITCH_PLATFORM = re.compile('|'.join(map(re.escape, _SWITCH_PREFIXES)))
+
+# ijson prefixes of a MAC table row in a single-command batch reply. The reply may come
+# wrapped in an array or as a bare object, and NX-API sends a lone row as an object rather
+# than a list, so every combination is accepted
+_MAC_ROW_PATH = f'result.body.{MAC_TABLE}.{MAC_ROW}'
+_MAC_ROW_PREFIXES = frozenset(
+    reply + _MAC_ROW_PATH + row for reply in ('', 'item.') for row in ('', '.item')
+)
+
+def _norm_chassis_id(chassis_id: Optional[str]) -> Optional[str]:
+    """Canonicalize an LLDP chassis ID to bare lower-case hex when it is a MAC address"""
+    if not chassis_id:
+        return chassis_id
+    mac = chassis_id.translate(_MAC_STRIP).lower()
+    # Other chassis ID subtypes (names, IPs) are kept verbatim
+    return mac if len(mac) == 12 and _HEX_DIGITS.issuperset(mac) else chassis_id
+
+def _extract_rows(body: Dict, table_key: str, row_key: str) -> List[Dict]:
+    """Return the rows of a TABLE_x/ROW_x output; NX-API sends a lone row as a dict, not a list"""
+    rows = (body or {}).get(table_key, {}).get(row_key, [])
+    return rows if isinstance(rows, list) else [rows]
+
+# Commands batched by collect_all, in the order their outputs are parsed
+COLLECT_ALL_COMMANDS = (
+    'show lldp neighbors detail',
+    'show mac address-table',
+    'show interface status'
+)
+
+# NX-API request envelopes: JSON-RPC, the legacy ins_api format, or probe the switch for JSON-RPC
+PROTOCOL_MODES = ('auto', 'rpc', 'ins')
+# Probe statuses meaning the switch has no JSON-RPC endpoint; any other HTTP error is re-raised
+_NO_RPC_STATUSES = frozenset((400, 404, 405, 415))
+
+# Connect and read timeouts (seconds) for every NX-API request
+REQUEST_TIMEOUT = (3, 30)
+
+# MAC table chunk requests sent to one switch at a time, in place of pausing between chunks
+MAC_CHUNK_WORKERS = 4
+
+# Sustained NX-API requests per second to one switch, and how many may go out back to back
+REQUEST_RATE = 5.0
+REQUEST_BURST = 5
+
+class NXAPIError(Exception):
+    """Raised when a switch cannot be queried or rejects a command"""
+
+class NXAPITransient(NXAPIError):
+    """NXAPIError worth retrying later: timeouts, refused connections, throttling, 5xx"""
+
+def _request_error(e: requests.exceptions.RequestException) -> NXAPIError:
+    """Translate a requests failure into the matching NXAPIError"""
+    status = e.response.status_code if e.response is not None else None
+    transient = (
+        isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                       requests.exceptions.RetryError))
+        or status == 429
+        or (status is not None and status >= 500)
+    )
+    error = NXAPITransient if transient else NXAPIError
+    return error(f"Failed to connect to switch: {str(e)}")
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() only sleeps once the burst allowance is spent"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Take the token up front; a negative balance is this caller's place in the queue
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+# Not frozen: the mapper fills in MACs and BMC hostnames after the switch queries
+@dataclass(slots=True)
 class PortConnection:
     interface: str
     connected_device: Optional[str]
@@ -13,203 +156,389 @@ class PortConnection:
     device_type: str  # 'switch', 'server', 'unknown'
 
 class NXAPIClient:
-    def __init__(self, host: str, username: str, password: str, port: int = 80):
+    # JSON-RPC request object for one CLI command; filled with the JSON-encoded command and id
+    _RPC_TMPL = b'{"jsonrpc":"2.0","method":"cli","params":{"cmd":%s,"version":1},"id":%d}'
+
+    def __init__(self, host: str, username: str, password: str, port: int = 80,
+                 cache: Optional[ResponseCache] = None, protocol_mode: str = 'auto'):
+        if protocol_mode not in PROTOCOL_MODES:
+            raise ValueError(f"Unsupported NX-API protocol mode: {protocol_mode}")
         self.host = host
         self.username = username
         self.password = password
         self.port = port
+        self.cache = cache
+        self.protocol_mode = protocol_mode
+        # Envelope used for every request; resolved by the first request in 'auto' mode
+        self._protocol: Optional[str] = None if protocol_mode == 'auto' else protocol_mode
+        self._protocol_lock = threading.Lock()
+        # Recent command output by command string, so repeat calls within a TTL skip the round trip
+        self._memo: Dict[str, Tuple[float, Dict]] = {}
         protocol = "https" if port == 443 else "http"
         self.base_url = f"{protocol}://{host}:{port}/ins"
         self.headers = {
-            'content-type': 'application/json-rpc'
+            'content-type': 'application/json-rpc',
+            'Accept-Encoding': 'gzip'  # Large show outputs compress well
         }
-        # Disable SSL warnings for self-signed certificates
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-    def _send_request(self, commands: List[str]) -> Dict:
+        # Paces uncached requests so chunked walks stay under the switch's NX-API rate limit
+        self._bucket = TokenBucket(rate=REQUEST_RATE, capacity=REQUEST_BURST)
+
+        # One keep-alive session per switch so every command reuses the TCP/TLS connection
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        self._session.auth = (username, password)
+        self._session.verify = False  # Required for self-signed certificates
+        # Show commands are read-only, so retrying the POST is safe
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['POST'])
+        ))
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def close(self):
+        """Close the client's pooled connections"""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send_request(self, commands: List[str]) -> Dict[str, Dict]:
+        """Run show commands, returning each successful command's output body keyed by command
+
+        Fresh cached output is served when available, and stale output is used on errors.
+        """
+        command = "; ".join(commands)
+        # A batched response is only as fresh as its fastest-changing command
+        ttl = min(_command_ttl(cmd) for cmd in commands)
+
+        now = time.monotonic()
+        memo = self._memo.get(command)
+        if memo is not None and now - memo[0] < ttl:
+            return memo[1]
+
+        if self.cache is not None:
+            cached = self.cache.get(self.host, command, ttl)
+            if cached is not None:
+                return cached
+
+        try:
+            result = self._send_uncached(commands)
+        except NXAPIError as e:
+            stale = self.cache.get_stale(self.host, command) if self.cache is not None else None
+            if stale is None:
+                raise
+            logger.warning("Using stale cached '%s' output for %s: %s", command, self.host, e)
+            return stale
+        # Partial output isn't kept, so the next call retries every command instead of reusing it
+        if all(cmd in result for cmd in commands):
+            self._memo[command] = (now, result)
+            if self.cache is not None:
+                self.cache.set(self.host, command, result)
+        return result
+
+    def invalidate(self):
+        """Forget in-memory command output, e.g. after a configuration change on the switch"""
+        self._memo.clear()
+
+    def _send_uncached(self, commands: List[str]) -> Dict[str, Dict]:
+        """Send commands to the switch; every failure surfaces here as an NXAPIError"""
+        send = self._send_rpc if self._resolve_protocol() == 'rpc' else self._send_ins
+        try:
+            return send(commands)
+        except requests.exceptions.RequestException as e:
+            raise _request_error(e) from e
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Undecodable JSON or an envelope that doesn't match the protocol
+            raise NXAPIError(f"Malformed NX-API response from {self.host}: {str(e)}") from e
+
+    def _resolve_protocol(self) -> str:
+        """Return 'rpc' or 'ins', probing the switch once when protocol_mode is 'auto'"""
+        with self._protocol_lock:
+            if self._protocol is None:
+                try:
+                    replies = self._send_rpc(["show clock"])
+                except requests.exceptions.HTTPError as e:
+                    if e.response is None or e.response.status_code not in _NO_RPC_STATUSES:
+                        # Auth failures, throttling and 5xx say nothing about the envelope;
+                        # leave the mode unresolved so the next request probes again
+                        raise _request_error(e) from e
+                    logger.debug("No JSON-RPC endpoint on %s, using ins_api: %s", self.host, e)
+                    self._protocol = 'ins'
+                except (ValueError, KeyError, TypeError, AttributeError, NXAPIError) as e:
+                    # Reachable, but the batch was rejected or the reply isn't JSON-RPC
+                    logger.debug("JSON-RPC probe failed on %s, using ins_api: %s", self.host, e)
+                    self._protocol = 'ins'
+                except requests.exceptions.RequestException as e:
+                    # Unreachable: leave the mode unresolved so the next request probes again
+                    raise _request_error(e) from e
+                else:
+                    self._protocol = 'rpc' if "show clock" in replies else 'ins'
+            return self._protocol
+
+    def _send_rpc(self, commands: List[str]) -> Dict[str, Dict]:
+        """Send commands as one JSON-RPC batch and return each successful command's body"""
+        # Each command gets its own request object, id and reply;
+        # only the command string needs serializing, the envelope is prebuilt
+        rpc_payload = b"[" + b",".join(
+            self._RPC_TMPL % (_dumps(cmd), i) for i, cmd in enumerate(commands, 1)
+        ) + b"]"
+
+        self._bucket.acquire()
+        response = self._session.post(
+            self.base_url,
+            data=rpc_payload,
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        replies = _loads(response.content)
+
+        # A bare reply object, not an array, comes back when the whole batch is rejected
+        # (an error with no id) and from some switches when answering a one-command batch
+        if isinstance(replies, dict):
+            if 'error' in replies and replies.get('id') is None:
+                raise NXAPIError(f"NX-API rejected the request on {self.host}: {replies['error']}")
+            replies = [replies]
+
+        bodies = {}
+        for reply in replies:
+            index = reply.get('id')
+            if not isinstance(index, int) or not 1 <= index <= len(commands):
+                continue
+            cmd = commands[index - 1]
+            if 'result' in reply:
+                # Commands with no output return a null result
+                body = (reply['result'] or {}).get('body')
+                bodies[cmd] = body if isinstance(body, dict) else {}
+            else:
+                logger.warning("Command '%s' failed on %s: %s", cmd, self.host, reply.get('error'))
+        return bodies
+
+    def _send_ins(self, commands: List[str]) -> Dict[str, Dict]:
+        """Send commands through the legacy ins_api envelope and return each successful command's body"""
         payload = {
             "ins_api": {
                 "version": "1.0",
                 "type": "cli_show",
                 "chunk": "0",
                 "sid": "sid",
-                "input": "; ".join(commands),
+                "input": " ;".join(commands),
                 "output_format": "json"
             }
         }
 
-        try:
-            # Update payload format for JSON-RPC
-            rpc_payload = {
-                "jsonrpc": "2.0",
-                "method": "cli",
-                "params": {
-                    "cmd": "; ".join(commands),
-                    "version": 1
-                },
-                "id": 1
-            }
-            
-            response = requests.post(
-                self.base_url,
-                data=json.dumps(rpc_payload),
-                headers=self.headers,
-                auth=(self.username, self.password),
-                verify=False  # Required for self-signed certificates
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to connect to switch: {str(e)}")
+        self._bucket.acquire()
+        response = self._session.post(
+            self.base_url,
+            data=_dumps(payload),
+            headers={'content-type': 'application/json'},
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        outputs = _loads(response.content)['ins_api']['outputs']['output']
+        # A single command's output is an object rather than a one-element list
+        if not isinstance(outputs, list):
+            outputs = [outputs]
+
+        bodies = {}
+        for cmd, output in zip(commands, outputs):
+            if str(output.get('code')) == '200':
+                # Commands with no output return an empty string body
+                body = output.get('body')
+                bodies[cmd] = body if isinstance(body, dict) else {}
+            else:
+                logger.warning("Command '%s' failed on %s: %s", cmd, self.host, output.get('msg'))
+        return bodies
 
     def get_lldp_neighbors(self) -> List[PortConnection]:
         """Get LLDP neighbor information"""
-        response = self._send_request(["show lldp neighbors detail"])
-        neighbors = []
+        body = self._send_request(["show lldp neighbors detail"]).get("show lldp neighbors detail", {})
+        return self._parse_lldp_body(body)
 
+    @staticmethod
+    def _parse_lldp_body(body: Dict) -> List[PortConnection]:
+        """Build connections from a 'show lldp neighbors detail' body"""
+        return [
+            PortConnection(
+                interface=intern(neighbor.get('l_port_id', '')),
+                connected_device=intern(neighbor.get('sys_name', '')),
+                mac_address=_norm_chassis_id(neighbor.get('chassis_id', None)),
+                protocol='LLDP',
+                device_type='switch' if _SWITCH_PLATFORM.search(neighbor.get('sys_desc', '')) else 'unknown'
+            )
+            for neighbor in _extract_rows(body, LLDP_TABLE, LLDP_ROW)
+        ]
+
+    def get_mac_address_table(self) -> List[PortConnection]:
+        """Get MAC address table information, in chunks by interface if the full table fails"""
+        return self._mac_columns_to_connections(self.get_mac_address_table_soa())
+
+    def get_mac_address_table_soa(self) -> Dict[str, List[str]]:
+        """Get the MAC address table as parallel 'interface' and 'mac_address' lists
+
+        The unfiltered table is tried first; interface-by-interface chunks are only walked
+        when that fails or comes back empty. Cheaper than get_mac_address_table when only
+        the MAC-to-port mapping is needed, e.g. dict(zip(table['mac_address'], table['interface'])).
+        """
+        # Fast path: modern NX-OS returns the whole table quicker than per-interface queries
         try:
-            # Parse NX-API response
-            if isinstance(response, dict):
-                result = response
-            else:
-                result = response.json()
+            table = self._fetch_mac_columns("show mac address-table")
+            if table['mac_address']:
+                logger.info("Total MAC entries collected from %s: %d", self.host, len(table['mac_address']))
+                return table
+        except NXAPITransient:
+            # Only a rejected or unreadable unfiltered query is worth retrying in chunks
+            raise
+        except NXAPIError as e:
+            logger.debug("Unfiltered MAC table query failed on %s, querying in chunks: %s", self.host, e)
 
-            neighbor_data = {}
-            if 'ins_api' in result:
-                # Handle legacy NX-API format
-                if isinstance(result['ins_api']['outputs']['output'], list):
-                    neighbor_data = result['ins_api']['outputs']['output'][0]['body']
-                else:
-                    neighbor_data = result['ins_api']['outputs']['output']['body']
-            elif 'result' in result:
-                # Handle JSON-RPC format
-                output = result.get('result', {})
-                if isinstance(output, list):
-                    neighbor_data = output[0].get('body', {})
-                else:
-                    neighbor_data = output.get('body', {})
+        table = {'interface': [], 'mac_address': []}
+        chunk_size = 8  # Number of interfaces per chunk
 
-            for neighbor in neighbor_data.get('TABLE_nbor_detail', {}).get('ROW_nbor_detail', []):
-                neighbors.append(PortConnection(
-                    interface=neighbor.get('l_port_id', ''),
-                    connected_device=neighbor.get('sys_name', ''),
-                    mac_address=neighbor.get('chassis_id', None),
-                    protocol='LLDP',
-                    device_type='switch' if 'N9K' in neighbor.get('sys_desc', '') else 'unknown'
-                ))
+        # First get all interfaces
+        interfaces = list(self.get_interface_status())
+        logger.debug("Found %d interfaces on %s to process in chunks", len(interfaces), self.host)
 
-        except (KeyError, AttributeError) as e:
-            print(f"Error parsing LLDP data: {str(e)}")
+        chunks = [interfaces[i:i+chunk_size] for i in range(0, len(interfaces), chunk_size)]
+        if chunks:
+            # A few chunks in flight at once keeps the per-switch request rate bounded
+            with ThreadPoolExecutor(max_workers=min(MAC_CHUNK_WORKERS, len(chunks))) as executor:
+                for chunk_table in executor.map(self._get_mac_chunk, chunks):
+                    table['interface'].extend(chunk_table['interface'])
+                    table['mac_address'].extend(chunk_table['mac_address'])
 
-        return neighbors
+        logger.info("Total MAC entries collected from %s: %d", self.host, len(table['mac_address']))
+        return table
 
-    def get_mac_address_table(self) -> List[PortConnection]:
-        """Get MAC address table information in chunks by interface"""
-        mac_entries = []
-        chunk_size = 8  # Number of interfaces per chunk
+    def _get_mac_chunk(self, interface_chunk: List[str]) -> Dict[str, List[str]]:
+        """Get MAC address table columns for one chunk of interfaces"""
+        table = {'interface': [], 'mac_address': []}
+        logger.debug("Processing interfaces %s to %s on %s", interface_chunk[0], interface_chunk[-1], self.host)
+
+        # Build command for this chunk of interfaces; NX-OS accepts a comma-separated list
+        interface_params = ",".join(interface_chunk)
+        cmd = f"show mac address-table interface {interface_params}"
 
         try:
-            # First get all interfaces
-            interface_status = self.get_interface_status()
-            interfaces = list(interface_status.keys())
-            print(f"Found {len(interfaces)} interfaces to process in chunks")
-
-            # Process interfaces in chunks
-            for i in range(0, len(interfaces), chunk_size):
-                interface_chunk = interfaces[i:i+chunk_size]
-                print(f"Processing interfaces {i+1} to {min(i+chunk_size, len(interfaces))}")
-                
-                # Build command for this chunk of interfaces
-                interface_params = " interface ".join(interface_chunk)
-                cmd = f"show mac address-table interface {interface_params}"
-                
-                try:
-                    response = self._send_request([cmd])
-                    
-                    # Parse response
-                    if isinstance(response, dict):
-                        result = response
-                    else:
-                        result = response.json()
-
-                    mac_data = {}
-                    if 'ins_api' in result:
-                        # Handle legacy NX-API format
-                        if isinstance(result['ins_api']['outputs']['output'], list):
-                            mac_data = result['ins_api']['outputs']['output'][0]['body']
-                        else:
-                            mac_data = result['ins_api']['outputs']['output']['body']
-                    elif 'result' in result:
-                        # Handle JSON-RPC format
-                        output = result.get('result', {})
-                        if isinstance(output, list):
-                            mac_data = output[0].get('body', {})
-                        else:
-                            mac_data = output.get('body', {})
-
-                    # Process MAC entries for this chunk
-                    entries = mac_data.get('TABLE_mac_address', {}).get('ROW_mac_address', [])
-                    if not isinstance(entries, list):
-                        entries = [entries]
-
-                    for entry in entries:
-                        if entry:  # Skip empty entries
-                            mac_entries.append(PortConnection(
-                                interface=entry.get('disp_port', ''),
-                                connected_device=None,  # MAC table doesn't provide hostname
-                                mac_address=entry.get('disp_mac_addr', ''),
-                                protocol=None,
-                                device_type='unknown'
-                            ))
-
-                    print(f"Found {len(entries)} MAC entries in current chunk")
-                    
-                    # Add delay between chunks to respect rate limits
-                    if i + chunk_size < len(interfaces):  # Don't sleep after the last chunk
-                        time.sleep(1)  # 1 second delay between chunks
-
-                except Exception as chunk_error:
-                    print(f"Error processing interface chunk {interface_chunk}: {str(chunk_error)}")
-                    continue  # Continue with next chunk even if this one fails
-
-        except (KeyError, AttributeError) as e:
-            print(f"Error in MAC address table collection: {str(e)}")
-
-        print(f"Total MAC entries collected: {len(mac_entries)}")
-        return mac_entries
+            # Process MAC entries for this chunk
+            table = self._fetch_mac_columns(cmd)
+            logger.debug("Found %d MAC entries in current chunk", len(table['mac_address']))
 
-    def get_interface_status(self) -> Dict[str, str]:
-        """Get interface status information"""
-        response = self._send_request(["show interface status"])
-        interfaces = {}
+        except NXAPIError as chunk_error:
+            logger.warning("Error processing interface chunk %s on %s: %s", interface_chunk, self.host, chunk_error)
+            # Other chunks are still collected if this one fails
+
+        return table
+
+    def _fetch_mac_columns(self, cmd: str) -> Dict[str, List[str]]:
+        """Run a MAC table command, streaming the rows when nothing needs the decoded body"""
+        if ijson is None or self.cache is not None or self._resolve_protocol() != 'rpc':
+            return self._parse_mac_columns(self._send_request([cmd]).get(cmd, {}))
+        return self._stream_mac_columns(cmd)
+
+    def _stream_mac_columns(self, cmd: str) -> Dict[str, List[str]]:
+        """Run a MAC table command and build its columns while the response is still arriving
 
+        Peak memory is the columns plus one row, instead of the whole decoded document.
+        """
+        self._bucket.acquire()
         try:
-            # Parse NX-API response
-            if isinstance(response, dict):
-                result = response
-            else:
-                result = response.json()
+            response = self._session.post(
+                self.base_url,
+                data=b"[" + self._RPC_TMPL % (_dumps(cmd), 1) + b"]",
+                timeout=REQUEST_TIMEOUT,
+                stream=True
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise _request_error(e) from e
 
-            interface_data = {}
-            if 'ins_api' in result:
-                # Handle legacy NX-API format
-                if isinstance(result['ins_api']['outputs']['output'], list):
-                    interface_data = result['ins_api']['outputs']['output'][0]['body']
-                else:
-                    interface_data = result['ins_api']['outputs']['output']['body']
-            elif 'result' in result:
-                # Handle JSON-RPC format
-                output = result.get('result', {})
-                if isinstance(output, list):
-                    interface_data = output[0].get('body', {})
-                else:
-                    interface_data = output.get('body', {})
+        table = {'interface': [], 'mac_address': []}
+        port = mac = None
+        with response:
+            # Let urllib3 undo gzip before ijson sees the bytes
+            response.raw.decode_content = True
+            try:
+                for prefix, event, value in ijson.parse(response.raw):
+                    if event == 'string':
+                        parent, _, key = prefix.rpartition('.')
+                        if parent in _MAC_ROW_PREFIXES:
+                            if key == 'disp_port':
+                                port = value
+                            elif key == 'disp_mac_addr':
+                                mac = value
+                    elif event == 'end_map' and prefix in _MAC_ROW_PREFIXES:
+                        if port is not None or mac is not None:  # Skip empty entries
+                            table['interface'].append(intern(port or ''))
+                            table['mac_address'].append((mac or '').translate(_MAC_STRIP).lower())
+                        port = mac = None
+                    elif event == 'map_key' and value == 'error' and prefix in ('', 'item'):
+                        raise NXAPIError(f"Command '{cmd}' failed on {self.host}")
+            except urllib3.exceptions.HTTPError as e:
+                # The connection dropped part way through the body
+                raise NXAPITransient(f"Failed to read MAC table from {self.host}: {str(e)}") from e
+            except ijson.JSONError as e:
+                raise NXAPIError(f"Malformed NX-API response from {self.host}: {str(e)}") from e
+        return table
 
-            for interface in interface_data.get('TABLE_interface', {}).get('ROW_interface', []):
-                interfaces[interface.get('interface', '')] = interface.get('state', '')
+    @staticmethod
+    def _parse_mac_columns(body: Dict) -> Dict[str, List[str]]:
+        """Split a 'show mac address-table' body into interface and MAC columns"""
+        entries = [entry for entry in _extract_rows(body, MAC_TABLE, MAC_ROW) if entry]
+        return {
+            # Port names repeat once per MAC learned on them; MACs are unique, so aren't interned
+            'interface': [intern(entry.get('disp_port', '')) for entry in entries],
+            'mac_address': [entry.get('disp_mac_addr', '').translate(_MAC_STRIP).lower() for entry in entries]
+        }
 
-        except (KeyError, AttributeError) as e:
-            print(f"Error parsing interface status: {str(e)}")
+    @staticmethod
+    def _mac_columns_to_connections(table: Dict[str, List[str]]) -> List[PortConnection]:
+        """Build one connection per MAC table row"""
+        return [
+            PortConnection(
+                interface=interface,
+                connected_device=None,  # MAC table doesn't provide hostname
+                mac_address=mac_address,
+                protocol=None,
+                device_type='unknown'
+            )
+            for interface, mac_address in zip(table['interface'], table['mac_address'])
+        ]
 
-        return interfaces
+    def get_interface_status(self) -> Dict[str, str]:
+        """Get interface status information"""
+        body = self._send_request(["show interface status"]).get("show interface status", {})
+        return self._parse_if_body(body)
+
+    @staticmethod
+    def _parse_if_body(body: Dict) -> Dict[str, str]:
+        """Map interface name to state from a 'show interface status' body"""
+        # Rows without an interface name are skipped rather than all landing on ''
+        return {
+            intern(row['interface']): intern(row.get('state', ''))
+            for row in _extract_rows(body, IF_TABLE, IF_ROW)
+            if 'interface' in row
+        }
+
+    def collect_all(self) -> Dict:
+        """Run the LLDP, MAC table and interface status commands in a single JSON-RPC batch
+
+        Returns {'lldp': [...], 'mac': [...], 'interfaces': {...}}; raises if any command
+        fails, so callers can fall back to the per-command getters.
+        """
+        bodies = self._send_request(list(COLLECT_ALL_COMMANDS))
+        missing = [cmd for cmd in COLLECT_ALL_COMMANDS if cmd not in bodies]
+        if missing:
+            raise NXAPIError(f"No output from {self.host} for: {', '.join(missing)}")
+        lldp_body, mac_body, if_body = (bodies[cmd] for cmd in COLLECT_ALL_COMMANDS)
+        return {
+            'lldp': self._parse_lldp_body(lldp_body),
+            'mac': self._mac_columns_to_connections(self._parse_mac_columns(mac_body)),
+            'interfaces': self._parse_if_body(if_body)
+        }
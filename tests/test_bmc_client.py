@@ -0,0 +1,46 @@
+import json
+import unittest
+
+import requests
+
+from switch_mapper.bmc_client import RedfishClient
+
+class _Response:
+    def __init__(self, data, status_code: int = 200):
+        self.content = json.dumps(data).encode()
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+_ROOT = {'ProtocolFeaturesSupported': {'ExpandQuery': {'NoLinks': True, 'Levels': True}}}
+_COLLECTION = 'Systems/1/EthernetInterfaces'
+_MEMBER = '/redfish/v1/Systems/1/EthernetInterfaces/1'
+
+class CollectionMembersTest(unittest.TestCase):
+    def setUp(self):
+        self.client = RedfishClient('192.0.2.10', 'admin', 'password')
+        self.requested = []
+        self.client._dispatch['GET'] = self._get
+
+    def _get(self, url, data=None):
+        self.requested.append(url)
+        if url.endswith('/redfish/v1/'):
+            return _Response(_ROOT)
+        if url.endswith('$expand=.($levels=1)'):
+            return _Response({'error': 'Not implemented'}, 501)
+        if url.endswith(_COLLECTION):
+            return _Response({'Members': [{'@odata.id': _MEMBER}]})
+        if url.endswith(_MEMBER):
+            return _Response({'@odata.id': _MEMBER, 'MACAddress': 'aa:bb:cc:dd:ee:01'})
+        return _Response({}, 404)
+
+    def test_rejected_expand_falls_back_to_member_fetches(self):
+        with self.assertLogs('switch_mapper.bmc_client', 'WARNING'):
+            members = self.client._get_collection_members(_COLLECTION)
+        self.assertEqual(members, [(_MEMBER, {'@odata.id': _MEMBER, 'MACAddress': 'aa:bb:cc:dd:ee:01'})])
+        self.assertTrue(self.requested[-1].endswith(_MEMBER))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import importlib
+import unittest
+
+MODULES = (
+    'switch_mapper',
+    'switch_mapper.__main__',
+    'switch_mapper.bmc_client',
+    'switch_mapper.cache',
+    'switch_mapper.config',
+    'switch_mapper.mapper',
+    'switch_mapper.nxapi_client',
+)
+
+class ImportSmokeTest(unittest.TestCase):
+    def test_modules_import(self):
+        for name in MODULES:
+            with self.subTest(module=name):
+                importlib.import_module(name)
+
+    def test_public_names_resolve(self):
+        package = importlib.import_module('switch_mapper')
+        for name in package.__all__:
+            with self.subTest(name=name):
+                self.assertTrue(hasattr(package, name))
+
+if __name__ == '__main__':
+    unittest.main()
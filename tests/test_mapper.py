@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from switch_mapper.mapper import SwitchMapper
+
+class MapNetworkTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_file = os.path.join(tmp.name, 'network_diagram')
+        config_file = os.path.join(tmp.name, 'config.yaml')
+        with open(config_file, 'w') as f:
+            f.write("switches: []\nbmcs: []\n")
+        self.mapper = SwitchMapper(config_file)
+
+    def test_text_report_without_graphviz(self):
+        # A None entry makes `import graphviz` raise ImportError
+        with mock.patch.dict(sys.modules, {'graphviz': None}):
+            diagram_path, text_report = self.mapper.map_network(self.output_file)
+        self.assertEqual(diagram_path, "")
+        self.assertTrue(text_report.startswith("Network Connection Report"))
+
+if __name__ == '__main__':
+    unittest.main()
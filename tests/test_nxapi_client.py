@@ -0,0 +1,190 @@
+import io
+import os
+import tempfile
+import unittest
+
+import requests
+
+from switch_mapper.cache import ResponseCache
+from switch_mapper.mapper import SwitchMapper
+from switch_mapper.nxapi_client import (
+    COLLECT_ALL_COMMANDS, NXAPIClient, NXAPIError, NXAPITransient, ijson
+)
+
+class _Response:
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+class _FakeSession:
+    """Stands in for requests.Session, answering every POST with the same body and status"""
+
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        return _Response(self.content, self.status_code)
+
+    def close(self):
+        pass
+
+class _StreamResponse:
+    def __init__(self, content: bytes):
+        self.raw = io.BytesIO(content)
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+class _StreamSession(_FakeSession):
+    """Answers every POST with the same body as a readable stream"""
+
+    def post(self, url, **kwargs):
+        return _StreamResponse(self.content)
+
+class _RefusingSession:
+    """Stands in for requests.Session on a switch that refuses every connection"""
+
+    def __init__(self):
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        raise requests.exceptions.ConnectionError("Connection refused")
+
+    def close(self):
+        pass
+
+class MalformedReplyTest(unittest.TestCase):
+    def _client(self, protocol_mode: str) -> NXAPIClient:
+        client = NXAPIClient('192.0.2.1', 'admin', 'password', protocol_mode=protocol_mode)
+        client._session = _FakeSession(b'["unexpected"]')
+        return client
+
+    def test_collect_all_raises_nxapi_error(self):
+        for protocol_mode in ('auto', 'rpc', 'ins'):
+            with self.subTest(protocol_mode=protocol_mode):
+                with self.assertRaises(NXAPIError):
+                    self._client(protocol_mode).collect_all()
+
+    def test_auto_probe_falls_back_to_ins(self):
+        client = self._client('auto')
+        self.assertEqual(client._resolve_protocol(), 'ins')
+
+# collect_all batch reply in which the MAC table command failed
+_PARTIAL_BATCH = (b'[{"jsonrpc":"2.0","result":{"body":{}},"id":1},'
+                  b'{"jsonrpc":"2.0","error":{"code":-32602,"message":"Busy"},"id":2},'
+                  b'{"jsonrpc":"2.0","result":{"body":{}},"id":3}]')
+
+class PartialBatchTest(unittest.TestCase):
+    def test_partial_batch_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(tmp)
+            self.addCleanup(cache.close)
+            client = NXAPIClient('192.0.2.1', 'admin', 'password', cache=cache, protocol_mode='rpc')
+            session = client._session = _FakeSession(_PARTIAL_BATCH)
+            for _ in range(2):
+                with self.assertLogs('switch_mapper.nxapi_client', 'WARNING'):
+                    with self.assertRaises(NXAPIError):
+                        client.collect_all()
+            # Each call goes back to the switch rather than reusing the incomplete result
+            self.assertEqual(session.posts, 2)
+            self.assertIsNone(cache.get_stale(client.host, "; ".join(COLLECT_ALL_COMMANDS)))
+
+class ProtocolProbeTest(unittest.TestCase):
+    def _probe(self, status_code: int) -> NXAPIClient:
+        client = NXAPIClient('192.0.2.1', 'admin', 'password')
+        client._session = _FakeSession(b'', status_code)
+        return client
+
+    def test_missing_endpoint_falls_back_to_ins(self):
+        for status_code in (404, 405, 415):
+            with self.subTest(status_code=status_code):
+                self.assertEqual(self._probe(status_code)._resolve_protocol(), 'ins')
+
+    def test_other_http_errors_leave_protocol_unresolved(self):
+        cases = {401: NXAPIError, 403: NXAPIError, 429: NXAPITransient, 500: NXAPITransient}
+        for status_code, error in cases.items():
+            with self.subTest(status_code=status_code):
+                client = self._probe(status_code)
+                with self.assertRaises(error):
+                    client._resolve_protocol()
+                self.assertIsNone(client._protocol)
+
+_ROW_A = b'{"disp_port":"Eth1/1","disp_mac_addr":"AABB.CCDD.EE01"}'
+_ROW_B = b'{"disp_port":"Eth1/2","disp_mac_addr":"aabb.ccdd.ee02"}'
+
+def _mac_reply(rows: bytes) -> bytes:
+    """A JSON-RPC reply object carrying a MAC table whose ROW_mac_address is rows"""
+    return (b'{"jsonrpc":"2.0","result":{"body":{"TABLE_mac_address":'
+            b'{"ROW_mac_address":' + rows + b'}}},"id":1}')
+
+@unittest.skipIf(ijson is None, "ijson is not installed")
+class StreamMacColumnsTest(unittest.TestCase):
+    def _stream(self, content: bytes):
+        client = NXAPIClient('192.0.2.1', 'admin', 'password', protocol_mode='rpc')
+        client._session = _StreamSession(content)
+        return client._stream_mac_columns("show mac address-table")
+
+    def test_reply_shapes(self):
+        both = {'interface': ['Eth1/1', 'Eth1/2'], 'mac_address': ['aabbccddee01', 'aabbccddee02']}
+        one = {'interface': ['Eth1/1'], 'mac_address': ['aabbccddee01']}
+        cases = {
+            'array reply': (b'[' + _mac_reply(b'[' + _ROW_A + b',' + _ROW_B + b']') + b']', both),
+            'bare-object reply': (_mac_reply(b'[' + _ROW_A + b',' + _ROW_B + b']'), both),
+            'array reply, single row': (b'[' + _mac_reply(_ROW_A) + b']', one),
+            'bare-object reply, single row': (_mac_reply(_ROW_A), one),
+            'empty entries skipped': (_mac_reply(b'[{},' + _ROW_A + b']'), one)
+        }
+        for name, (content, expected) in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self._stream(content), expected)
+
+    def test_error_reply_raises(self):
+        error = b'{"jsonrpc":"2.0","error":{"code":-32602,"message":"Invalid params"},"id":1}'
+        for content in (error, b'[' + error + b']'):
+            with self.subTest(content=content):
+                with self.assertRaises(NXAPIError):
+                    self._stream(content)
+
+    def test_truncated_reply_raises(self):
+        with self.assertRaises(NXAPIError):
+            self._stream(b'[' + _mac_reply(b'[' + _ROW_A)[:-10])
+
+class TransientErrorTest(unittest.TestCase):
+    def setUp(self):
+        self.session = _RefusingSession()
+        self.client = NXAPIClient('192.0.2.1', 'admin', 'password')
+        self.client._session = self.session
+
+    def test_mac_table_skips_chunked_walk(self):
+        with self.assertRaises(NXAPITransient):
+            self.client.get_mac_address_table_soa()
+        self.assertEqual(self.session.posts, 1)
+
+    def test_mapper_skips_per_command_fallback(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = os.path.join(tmp, 'config.yaml')
+            with open(config_file, 'w') as f:
+                f.write("switches:\n- {hostname: sw1, ip: 192.0.2.1, username: admin, password: password}\n")
+            mapper = SwitchMapper(config_file)
+            switch_config = mapper.config.switches[0]
+            mapper._nx_clients[(switch_config.ip, switch_config.port)] = self.client
+            with self.assertRaises(NXAPITransient):
+                mapper._gather_one_switch(switch_config)
+        self.assertEqual(self.session.posts, 1)
+
+if __name__ == '__main__':
+    unittest.main()